@@ -30,6 +30,7 @@ class Config:
         self.symbol = "1HZ100V"
         self.max_trades = 200
         self.demo_mode = True
+        self.records_dir = "records"
         
     def get_user_input(self):
         """Get configuration from user"""
@@ -200,6 +201,87 @@ class DerivAPI:
         except:
             return 0
 
+class TradeRecorder:
+    """Append ticks and trades to daily CSV files for offline analysis
+
+    Files are named <kind>_<symbol>_<YYYYMMDD>.csv inside records_dir and
+    are read back by session_report.py.
+    """
+    TICK_FIELDS = ['epoch', 'price']
+    TRADE_FIELDS = ['epoch', 'direction', 'stake', 'profit', 'result',
+                    'z_score', 'z_threshold']
+
+    def __init__(self, records_dir):
+        self.records_dir = records_dir
+        self.files = {}
+        self.enabled = True
+
+        try:
+            os.makedirs(self.records_dir, exist_ok=True)
+        except OSError as e:
+            print(Fore.RED + f"❌ Recording disabled: {str(e)}")
+            self.enabled = False
+
+    def get_file(self, kind, symbol, epoch, fields):
+        """Return the open file for this kind/symbol/day, rolling at midnight GMT"""
+        day = time.strftime("%Y%m%d", time.gmtime(epoch))
+        key = (kind, symbol)
+        current = self.files.get(key)
+        if current and current[0] == day:
+            return current[1]
+        if current:
+            current[1].close()
+
+        path = os.path.join(self.records_dir, f"{kind}_{symbol}_{day}.csv")
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        torn = False
+        if not is_new:
+            # A killed session can leave a partial last row; never append onto it
+            with open(path, 'rb') as existing:
+                existing.seek(-1, os.SEEK_END)
+                torn = existing.read(1) != b'\n'
+        handle = open(path, 'a')
+        if is_new:
+            handle.write(','.join(fields) + '\n')
+            handle.flush()
+        elif torn:
+            # End the partial row, then leave a blank line so readers drop it
+            handle.write('\n\n')
+        self.files[key] = (day, handle)
+        return handle
+
+    def write(self, kind, symbol, fields, values, flush=False):
+        """Write one CSV row stamped with the current epoch"""
+        if not self.enabled:
+            return
+        epoch = time.time()
+        try:
+            handle = self.get_file(kind, symbol, epoch, fields)
+            handle.write(','.join([f"{epoch:.3f}"] + values) + '\n')
+            if flush:
+                handle.flush()
+        except OSError as e:
+            print(Fore.RED + f"\n❌ Recording disabled: {str(e)}")
+            self.enabled = False
+
+    def record_tick(self, symbol, price):
+        """Record a market price"""
+        self.write('ticks', symbol, self.TICK_FIELDS,
+                   [f"{price:.5f}"])
+
+    def record_trade(self, symbol, direction, stake, profit, z_score, z_threshold):
+        """Record a trade outcome with the z-score that triggered it"""
+        self.write('trades', symbol, self.TRADE_FIELDS,
+                   [direction, f"{stake:.2f}", f"{profit:.2f}",
+                    'WIN' if profit > 0 else 'LOSS', f"{z_score:.4f}", f"{z_threshold:.4f}"],
+                   flush=True)
+
+    def close(self):
+        """Flush and close all open record files"""
+        for _, handle in self.files.values():
+            handle.close()
+        self.files = {}
+
 class TradingStrategy:
     """Smart Mean Reversion Strategy for StepIndex"""
     def __init__(self):
@@ -332,6 +414,7 @@ class TradingBot:
         self.config = Config().get_user_input()
         self.api = DerivAPI(self.config)
         self.strategy = TradingStrategy()
+        self.recorder = TradeRecorder(self.config.records_dir)
         
         # Initialize balances
         self.initial_balance = self.api.get_balance()
@@ -473,6 +556,7 @@ class TradingBot:
         # Update price
         current_price = self.get_market_price()
         self.strategy.update_price(current_price)
+        self.recorder.record_tick(self.config.symbol, current_price)
         
         # Get trading signal
         signal = self.strategy.get_signal()
@@ -524,6 +608,8 @@ class TradingBot:
                 
                 # Record trade
                 self.strategy.record_trade(signal, stake, profit)
+                self.recorder.record_trade(self.config.symbol, signal, stake, profit,
+                                           stats['z_score'], self.strategy.z_threshold)
                 
                 # Display result
                 self.print_trade_result(self.trade_count, signal, stake, profit)
@@ -597,6 +683,7 @@ class TradingBot:
             print(Fore.YELLOW + "\n\n🛑 Manual stop requested by user")
             
         finally:
+            self.recorder.close()
             # Final summary
             self.final_summary()
             
@@ -626,6 +713,10 @@ class TradingBot:
             print("  • Strategy is working well!")
             print("  • Consider increasing stake gradually")
             
+        if self.recorder.enabled:
+            print(Fore.CYAN + f"\n🗂️  Ticks and trades recorded in {self.config.records_dir}/")
+            print("  • Run: python session_report.py --records-dir " + self.config.records_dir)
+            
         print(Fore.GREEN + "\n✅ Trading session completed!")
         print(Fore.YELLOW + "Run the script again to start a new session.")
 
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+DERIV STEPINDEX TRADING BOT - SESSION REPORT
+Offline analytics for ticks and trades recorded by deriv_bot.py
+Writes CSV tables and a self-contained HTML report
+"""
+
+import argparse
+import glob
+import html
+import os
+import sys
+import warnings
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from colorama import init, Fore, Style
+
+# Initialize colorama for colored output
+init(autoreset=True)
+
+# Absolute z-score bucket edges used for trades and tick calibration
+Z_BUCKETS = [0, 1.0, 1.5, 1.8, 2.0, 2.2, 2.5, 3.0, np.inf]
+Z_LABELS = [f"{lo:.1f}-{hi:.1f}" if np.isfinite(hi) else f"{lo:.1f}+"
+            for lo, hi in zip(Z_BUCKETS[:-1], Z_BUCKETS[1:])]
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD argument into a YYYYMMDD file date"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y%m%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+
+def positive_int(value):
+    """Parse a strictly positive integer argument"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number '{value}'")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {number}")
+    return number
+
+
+def find_record_files(records_dir, kind, start, end, symbols):
+    """Return {symbol: [paths sorted by day]} for files inside the date range"""
+    found = {}
+    for path in glob.glob(os.path.join(records_dir, f"{kind}_*.csv")):
+        name = os.path.basename(path)[len(kind) + 1:-4]
+        symbol, _, day = name.rpartition('_')
+        if not symbol or len(day) != 8 or not day.isdigit():
+            continue
+        if (start and day < start) or (end and day > end):
+            continue
+        if symbols and symbol not in symbols:
+            continue
+        found.setdefault(symbol, []).append((day, path))
+    return {symbol: [path for _, path in sorted(files)] for symbol, files in sorted(found.items())}
+
+
+def z_bucket_index(z_scores):
+    """Map z-scores to indexes into Z_LABELS by absolute value"""
+    index = np.searchsorted(Z_BUCKETS, np.abs(z_scores), side='right') - 1
+    return np.clip(index, 0, len(Z_LABELS) - 1)
+
+
+def count_bad_lines(read):
+    """Run one pandas read step, returning its result and the bad lines it skipped
+
+    Warnings are captured only while the step runs; anything other than a
+    bad-line report is re-emitted.
+    """
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always', pd.errors.ParserWarning)
+        result = read()
+
+    bad = 0
+    for w in caught:
+        if issubclass(w.category, pd.errors.ParserWarning) and 'Skipping line' in str(w.message):
+            bad += str(w.message).count('Skipping line')
+        else:
+            warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+    return result, bad
+
+
+def read_records(path, columns, chunksize=None):
+    """Yield frames of a record file with torn rows dropped
+
+    A session killed mid-write can leave a partial last row. TradeRecorder
+    ends such a row with a blank line before appending again, so the row
+    before each blank line is dropped, as is a last row with no trailing
+    newline. Rows merged with another, or with non-numeric fields, are
+    skipped too, with a warning, so a single bad byte range cannot abort
+    the whole report. The last row of each chunk is held back until the
+    next line shows whether it was torn.
+    """
+    name = os.path.basename(path)
+    numeric = [column for column in columns if column != 'direction']
+    try:
+        reader, skipped = count_bad_lines(lambda: pd.read_csv(
+            path, usecols=columns, chunksize=chunksize, on_bad_lines='warn',
+            skip_blank_lines=False))
+    except (pd.errors.EmptyDataError, ValueError) as e:
+        # Empty file or torn header from a session killed right after creating it
+        print(Fore.YELLOW + f"⚠️  {name}: skipped unreadable file ({e})")
+        return
+
+    def clean(frame):
+        """Coerce numeric columns and drop rows left incomplete"""
+        nonlocal skipped
+        for column in numeric:
+            frame[column] = pd.to_numeric(frame[column], errors='coerce')
+        complete = frame.dropna(subset=numeric)
+        skipped += len(frame) - len(complete)
+        return complete
+
+    chunks = iter([reader]) if chunksize is None else reader
+    pending = None
+    try:
+        while True:
+            try:
+                frame, bad = count_bad_lines(lambda: next(chunks))
+            except StopIteration:
+                break
+            skipped += bad
+            if frame.empty:
+                continue
+            if pending is not None:
+                frame = pd.concat([pending, frame])
+            blank = frame[columns].isna().all(axis=1).to_numpy()
+            torn = np.append(blank[1:], False) & ~blank
+            skipped += int(torn[:-1].sum())
+            pending = frame.iloc[-1:]
+            if blank[-1]:
+                pending = None
+            yield clean(frame.iloc[:-1][~(blank | torn)[:-1]])
+    finally:
+        if chunksize is not None:
+            reader.close()
+
+    if pending is not None:
+        with open(path, 'rb') as handle:
+            handle.seek(-1, os.SEEK_END)
+            complete_last_row = handle.read(1) == b'\n'
+        if complete_last_row:
+            yield clean(pending)
+        else:
+            skipped += 1
+
+    if skipped:
+        print(Fore.YELLOW + f"⚠️  {name}: skipped {skipped} incomplete rows")
+
+
+class TickCalibration:
+    """Replay the strategy z-score over recorded ticks, one chunk at a time
+
+    For every tick with a full-enough window it checks whether the price
+    reverted towards the mean after `horizon` ticks. Only the last
+    window + horizon prices of each symbol are carried between chunks,
+    so memory is bounded by the chunk size rather than the history length.
+
+    A gap of more than `session_gap` seconds between ticks marks a new bot
+    session: like the live TradingStrategy, the replay then starts from an
+    empty history, and no outcome is measured across the gap.
+    """
+    def __init__(self, window=100, min_history=30, horizon=4, trend_limit=0.001,
+                 session_gap=60):
+        self.window = window
+        self.min_history = min_history
+        self.horizon = horizon
+        self.trend_limit = trend_limit
+        self.session_gap = session_gap
+        self.carry = {}
+        self.last_epoch = {}
+
+        size = len(Z_LABELS)
+        self.ticks = {}
+        self.sessions = {}
+        self.counts = {key: np.zeros(size, dtype=np.int64)
+                       for key in ('ticks', 'reverted', 'confirmed', 'confirmed_reverted')}
+
+    def add_chunk(self, symbol, epochs, prices):
+        """Evaluate a chunk of ticks for one symbol, split at session gaps"""
+        self.ticks[symbol] = self.ticks.get(symbol, 0) + len(prices)
+        if len(prices) == 0:
+            return
+
+        if symbol not in self.last_epoch:
+            self.sessions[symbol] = 1
+        gaps = np.diff(epochs, prepend=self.last_epoch.get(symbol, epochs[0]))
+        starts = np.flatnonzero((gaps > self.session_gap) | (gaps < 0))
+        edges = np.concatenate([[0], starts, [len(prices)]])
+        for index, (lo, hi) in enumerate(zip(edges[:-1], edges[1:])):
+            if index > 0:
+                self.carry.pop(symbol, None)
+                self.sessions[symbol] += 1
+            if hi > lo:
+                self.add_segment(symbol, prices[lo:hi])
+        self.last_epoch[symbol] = epochs[-1]
+
+    def add_segment(self, symbol, prices):
+        """Evaluate consecutive prices from a single session"""
+        tail = self.carry.get(symbol, np.empty(0))
+        values = np.concatenate([tail, prices])
+
+        # Same statistics as TradingStrategy.calculate_stats (population std).
+        # Rolling sums are computed on prices shifted towards zero, which
+        # leaves z unchanged but keeps float error far below bucket widths.
+        centered = pd.Series(values - values[0])
+        rolling = centered.rolling(self.window, min_periods=min(self.min_history, self.window))
+        std = rolling.std(ddof=0).to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (centered.to_numpy() - rolling.mean().to_numpy()) / std
+        # Step prices often land exactly on a bucket edge; rounding keeps
+        # the bucket independent of where chunks were split
+        z = np.round(z, 6)
+
+        # Least-squares slope over the last 5 prices, as np.polyfit(range(5), ...)
+        trend = np.full(len(values), np.nan)
+        if len(values) >= 5:
+            trend[4:] = (2 * values[4:] + values[3:-1] - values[1:-3] - 2 * values[:-4]) / 10
+
+        move = np.full(len(values), np.nan)
+        if len(values) > self.horizon:
+            move[:-self.horizon] = values[self.horizon:] - values[:-self.horizon]
+
+        # Rows of the carried tail were evaluated last time, except the last
+        # `horizon` ones which were still waiting for their outcome
+        first = max(0, len(tail) - self.horizon)
+        last = len(values) - self.horizon
+        if last > first:
+            z_eval = z[first:last]
+            valid = np.isfinite(z_eval) & (std[first:last] > 0)
+            z_eval = z_eval[valid]
+            move_eval = move[first:last][valid]
+            trend_eval = trend[first:last][valid]
+
+            reverted = np.where(z_eval > 0, move_eval < 0, move_eval > 0)
+            confirmed = np.where(z_eval > 0, trend_eval <= self.trend_limit,
+                                 trend_eval >= -self.trend_limit)
+            buckets = z_bucket_index(z_eval)
+            size = len(Z_LABELS)
+            self.counts['ticks'] += np.bincount(buckets, minlength=size)
+            self.counts['reverted'] += np.bincount(buckets, weights=reverted, minlength=size).astype(np.int64)
+            self.counts['confirmed'] += np.bincount(buckets, weights=confirmed, minlength=size).astype(np.int64)
+            self.counts['confirmed_reverted'] += np.bincount(
+                buckets, weights=confirmed & reverted, minlength=size).astype(np.int64)
+
+        self.carry[symbol] = values[-(self.window - 1 + self.horizon):]
+
+    def table(self):
+        """Reversion rates per z-score bucket"""
+        df = pd.DataFrame(self.counts, index=pd.Index(Z_LABELS, name='z_bucket'))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['reversion_rate'] = df['reverted'] / df['ticks'] * 100
+            df['confirmed_reversion_rate'] = df['confirmed_reverted'] / df['confirmed'] * 100
+        return df
+
+
+def read_ticks(files, calibration, chunksize):
+    """Stream tick files through the calibration in fixed-size chunks"""
+    for symbol, paths in files.items():
+        for path in paths:
+            for chunk in read_records(path, ['epoch', 'price'], chunksize):
+                calibration.add_chunk(symbol, chunk['epoch'].to_numpy(), chunk['price'].to_numpy())
+        print(Fore.GREEN + f"✅ {symbol}: {calibration.ticks.get(symbol, 0):,} ticks, "
+                           f"{calibration.sessions.get(symbol, 0)} sessions")
+
+
+def read_trades(files):
+    """Load trades in memory, keeping only the columns the report needs"""
+    columns = ['epoch', 'direction', 'stake', 'profit', 'z_score']
+    dtypes = {'epoch': np.float64, 'direction': 'category', 'stake': np.float64,
+              'profit': np.float64, 'z_score': np.float64}
+    frames = []
+    for symbol, paths in files.items():
+        for path in paths:
+            for frame in read_records(path, columns):
+                frames.append(frame.assign(symbol=symbol))
+
+    if not frames:
+        frames = [pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in dtypes.items()})
+                  .assign(symbol=pd.Series(dtype=str))]
+
+    trades = pd.concat(frames, ignore_index=True)
+    trades['symbol'] = trades['symbol'].astype('category')
+    trades['direction'] = trades['direction'].astype('category')
+    trades['win'] = trades['profit'] > 0
+    return trades.sort_values('epoch', kind='mergesort', ignore_index=True)
+
+
+def win_rate_table(trades, by):
+    """Trades, wins, win rate and profit grouped by the given keys"""
+    grouped = trades.groupby(by, observed=True)
+    table = grouped.agg(trades=('win', 'size'), wins=('win', 'sum'),
+                        profit=('profit', 'sum'), stake=('stake', 'sum'))
+    table['win_rate'] = table['wins'] / table['trades'] * 100
+    table['roi'] = table['profit'] / table['stake'] * 100
+    return table.drop(columns='stake')
+
+
+def equity_curves(trades):
+    """Cumulative profit and drawdown, combined and per symbol"""
+    equity = trades[['epoch', 'symbol', 'profit']].copy()
+    equity['time'] = pd.to_datetime(equity['epoch'], unit='s', utc=True)
+    equity['equity'] = equity['profit'].cumsum()
+    equity['drawdown'] = equity['equity'].cummax().clip(lower=0) - equity['equity']
+    equity['symbol_equity'] = equity.groupby('symbol', observed=True)['profit'].cumsum()
+    symbol_peak = equity.groupby('symbol', observed=True)['symbol_equity'].cummax().clip(lower=0)
+    equity['symbol_drawdown'] = symbol_peak - equity['symbol_equity']
+    return equity
+
+
+def drawdown_periods(equity):
+    """One row per drawdown, from the equity peak to recovery
+
+    Equity starts from a zero-balance origin before the first trade, and
+    only a strict new high starts a new period, so returning exactly to
+    the old high does not split a drawdown. peak_time is blank when the
+    peak is that starting balance. recovery_time is the first trade after
+    the trough that brings equity back to the peak, and is blank while
+    the drawdown is still open.
+    """
+    columns = ['peak_time', 'start_time', 'trough_time', 'recovery_time', 'depth', 'trades']
+    if equity.empty:
+        return pd.DataFrame(columns=columns)
+
+    origin = pd.DataFrame({'time': pd.Series([pd.NaT], dtype=equity['time'].dtype),
+                           'equity': [0.0]})
+    curve = pd.concat([origin, equity[['time', 'equity']]], ignore_index=True)
+    # Summed profits drift by ~1e-15; round so a return to the peak is a tie
+    curve['equity'] = curve['equity'].round(8)
+    high = curve['equity'].cummax()
+    new_high = curve['equity'] > high.shift(fill_value=-np.inf)
+    frame = curve.assign(group=new_high.cumsum(), drawdown=high - curve['equity'])
+
+    grouped = frame.groupby('group')
+    periods = grouped.agg(depth=('drawdown', 'max'))
+    periods['peak_time'] = frame['time'][new_high].set_axis(periods.index)
+    first_after_peak = frame.index[new_high] + 1
+    periods['start_time'] = frame['time'].reindex(first_after_peak).set_axis(periods.index)
+    trough_idx = grouped['drawdown'].idxmax()
+    periods['trough_time'] = frame['time'].loc[trough_idx].set_axis(trough_idx.index)
+    position = frame.index.to_series()
+    back_at_peak = (frame['drawdown'] == 0) & ~new_high & \
+        (position > frame['group'].map(trough_idx))
+    recovery_idx = position[back_at_peak].groupby(frame['group']).first()
+    periods['recovery_time'] = frame['time'].reindex(recovery_idx.reindex(periods.index)) \
+        .set_axis(periods.index).combine_first(periods['peak_time'].shift(-1))
+    # Trades after the peak, up to the one that brings equity back to it
+    in_drawdown = ~new_high & (position <= frame['group'].map(recovery_idx).fillna(np.inf))
+    periods['trades'] = in_drawdown.groupby(frame['group']).sum()
+    periods = periods[periods['depth'] > 0]
+    return periods[columns].sort_values('depth', ascending=False).reset_index(drop=True)
+
+
+def calibration_table(trades, ticks):
+    """Compare tick reversion rates with realised trade win rates per bucket"""
+    table = ticks.table()
+    if not trades.empty:
+        by_bucket = win_rate_table(trades.assign(
+            z_bucket=pd.Categorical.from_codes(z_bucket_index(trades['z_score']), Z_LABELS)), 'z_bucket')
+        table = table.join(by_bucket.add_prefix('trade_'))
+        table['calibration_gap'] = table['trade_win_rate'] - table['confirmed_reversion_rate']
+    return table
+
+
+def summary_table(trades, equity):
+    """Headline numbers per symbol plus a combined row"""
+    if trades.empty:
+        return pd.DataFrame()
+    summary = win_rate_table(trades, 'symbol')
+    summary['max_drawdown'] = equity.groupby('symbol', observed=True)['symbol_drawdown'].max()
+    summary['first_trade'] = equity.groupby('symbol', observed=True)['time'].min()
+    summary['last_trade'] = equity.groupby('symbol', observed=True)['time'].max()
+
+    total = win_rate_table(trades.assign(all='ALL'), 'all')
+    total['max_drawdown'] = equity['drawdown'].max()
+    total['first_trade'] = equity['time'].min()
+    total['last_trade'] = equity['time'].max()
+
+    wins = trades[trades['win']]
+    payout = (wins['profit'] / wins['stake']).mean() if not wins.empty else np.nan
+    total['breakeven_win_rate'] = 100 / (1 + payout)
+    return pd.concat([summary, total])
+
+
+def equity_svg(equity, width=900, height=260, max_points=1500):
+    """Inline SVG line chart of combined equity"""
+    if equity.empty:
+        return "<p>No trades in range.</p>"
+    step = max(1, len(equity) // max_points)
+    values = np.concatenate([[0.0], equity['equity'].to_numpy()[::step]])
+    low, high = min(values.min(), 0.0), max(values.max(), 0.0)
+    span = (high - low) or 1.0
+    xs = np.linspace(0, width, len(values))
+    ys = height - (values - low) / span * height
+    points = ' '.join(f"{x:.1f},{y:.1f}" for x, y in zip(xs, ys))
+    zero = height - (0 - low) / span * height
+    return (f'<svg viewBox="0 0 {width} {height}" width="100%" preserveAspectRatio="none">'
+            f'<line x1="0" y1="{zero:.1f}" x2="{width}" y2="{zero:.1f}" stroke="#999" stroke-dasharray="4"/>'
+            f'<polyline fill="none" stroke="#1a7f37" stroke-width="1.5" points="{points}"/></svg>'
+            f'<p>Equity from ${values[0]:.2f} to ${values[-1]:+.2f} (min ${low:.2f}, max ${high:.2f})</p>')
+
+
+def write_html(path, title, sections):
+    """Write a self-contained HTML page with inline CSS"""
+    style = ("body{font-family:sans-serif;margin:2em;color:#222}"
+             "table{border-collapse:collapse;margin-bottom:2em;font-size:13px}"
+             "th,td{border:1px solid #ccc;padding:4px 8px;text-align:right}"
+             "th{background:#f0f0f0}h2{margin-top:1.5em}")
+    body = ''.join(f"<h2>{html.escape(heading)}</h2>{content}" for heading, content in sections)
+    with open(path, 'w') as handle:
+        handle.write(f"<!DOCTYPE html><html><head><meta charset='utf-8'>"
+                     f"<title>{html.escape(title)}</title><style>{style}</style></head>"
+                     f"<body><h1>{html.escape(title)}</h1>{body}</body></html>")
+
+
+def frame_html(df):
+    """Render a table or a placeholder when empty"""
+    if df.empty:
+        return "<p>No data in range.</p>"
+    return df.to_html(float_format=lambda v: f"{v:.2f}", na_rep='-')
+
+
+def build_report(args):
+    """Read records, compute all tables and write the report files"""
+    symbols = set(args.symbols.split(',')) if args.symbols else None
+    tick_files = find_record_files(args.records_dir, 'ticks', args.start, args.end, symbols)
+    trade_files = find_record_files(args.records_dir, 'trades', args.start, args.end, symbols)
+    if not tick_files and not trade_files:
+        print(Fore.RED + f"❌ No records found in {args.records_dir}/ for this range")
+        return False
+
+    print(Fore.YELLOW + "📂 Reading ticks...")
+    ticks = TickCalibration(window=args.window, horizon=args.horizon,
+                            session_gap=args.session_gap)
+    read_ticks(tick_files, ticks, args.chunksize)
+
+    print(Fore.YELLOW + "📂 Reading trades...")
+    trades = read_trades(trade_files)
+    print(Fore.GREEN + f"✅ {len(trades):,} trades")
+
+    equity = equity_curves(trades)
+    trades['hour'] = equity['time'].dt.hour
+    tables = {
+        'summary': summary_table(trades, equity),
+        'hourly': win_rate_table(trades, ['hour']) if not trades.empty else pd.DataFrame(),
+        'z_buckets': calibration_table(trades, ticks),
+        'drawdowns': drawdown_periods(equity),
+    }
+
+    os.makedirs(args.out, exist_ok=True)
+    for name, table in tables.items():
+        table.to_csv(os.path.join(args.out, f"{name}.csv"))
+    equity.drop(columns='epoch').to_csv(os.path.join(args.out, 'equity.csv'), index=False)
+
+    span = f"{args.start or 'start'} to {args.end or 'end'}"
+    write_html(os.path.join(args.out, 'report.html'), f"Session report ({span})", [
+        ("Summary", frame_html(tables['summary'])),
+        ("Equity curve", equity_svg(equity)),
+        ("Win rate by hour (GMT)", frame_html(tables['hourly'])),
+        ("Signal calibration by |z-score|", frame_html(tables['z_buckets'])),
+        ("Drawdown periods", frame_html(tables['drawdowns'].head(args.top_drawdowns))),
+    ])
+
+    print(Fore.GREEN + f"\n✅ Report written to {args.out}/report.html")
+    return True
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Build an analytics report from recorded ticks and trades")
+    parser.add_argument('--records-dir', default='records', help="directory written by deriv_bot.py")
+    parser.add_argument('--from', dest='start', type=parse_date, help="first day, YYYY-MM-DD (GMT)")
+    parser.add_argument('--to', dest='end', type=parse_date, help="last day, YYYY-MM-DD (GMT)")
+    parser.add_argument('--symbols', help="comma separated symbols (default: all)")
+    parser.add_argument('--out', default='report', help="output directory")
+    parser.add_argument('--window', type=positive_int, default=100, help="z-score window in ticks")
+    parser.add_argument('--horizon', type=positive_int, default=4, help="contract duration in ticks")
+    parser.add_argument('--session-gap', type=positive_int, default=60,
+                        help="seconds without ticks that start a new session")
+    parser.add_argument('--chunksize', type=positive_int, default=500_000, help="tick rows per read chunk")
+    parser.add_argument('--top-drawdowns', type=positive_int, default=20, help="drawdowns shown in HTML")
+    return parser.parse_args(argv)
+
+
+# Main execution
+if __name__ == "__main__":
+    print(Fore.CYAN + Style.BRIGHT + "="*60)
+    print("        DERIV STEPINDEX SESSION REPORT")
+    print("="*60)
+    print(Style.RESET_ALL)
+
+    if not build_report(parse_args()):
+        sys.exit(1)